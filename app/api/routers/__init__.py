@@ -1,5 +1,5 @@
 # Import routers
-from app.api.routers import auth, challenges, submissions, matches, uploads
+from app.api.routers import auth, challenges, submissions, matches, uploads, metrics
 
 # Export routers
-__all__ = ["auth", "challenges", "submissions", "matches", "uploads"] 
\ No newline at end of file
+__all__ = ["auth", "challenges", "submissions", "matches", "uploads", "metrics"] 
\ No newline at end of file
@@ -3,8 +3,8 @@ from sqlmodel import Session, select
 from typing import List
 
 from app.db.database import get_session
-from app.models.models import User, Challenge
-from app.schemas.challenge import ChallengeCreate, ChallengeResponse, ChallengeWithCompany
+from app.models.models import User, Challenge, ChallengeStats
+from app.schemas.challenge import ChallengeCreate, ChallengeResponse, ChallengeWithCompany, ChallengeStatsResponse
 from app.utils.auth import get_current_active_user, get_current_company_user
 
 router = APIRouter(
@@ -30,6 +30,31 @@ def get_all_challenges(
     
     return challenges
 
+@router.get("/dashboard", response_model=List[ChallengeStatsResponse])
+def get_challenge_dashboard(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_company_user)
+):
+    """
+    Submission counts, unique candidates and latest submission time for each
+    of the current company's challenges. Match score distributions are served
+    by /match/score-distribution.
+    """
+    # Read the maintained aggregates, one row per challenge
+    statement = select(Challenge.id, Challenge.title, ChallengeStats).outerjoin(
+        ChallengeStats, ChallengeStats.challenge_id == Challenge.id
+    ).where(Challenge.company_id == current_user.id)
+    results = session.exec(statement).all()
+    
+    # Format results
+    dashboard = []
+    for challenge_id, title, stats in results:
+        stats_dict = stats.dict() if stats else ChallengeStats(challenge_id=challenge_id).dict()
+        stats_dict["challenge_title"] = title
+        dashboard.append(stats_dict)
+    
+    return dashboard
+
 @router.get("/{challenge_id}", response_model=ChallengeWithCompany)
 def get_challenge(
     challenge_id: int,
@@ -70,6 +95,9 @@ def create_challenge(
         company_id=current_user.id
     )
     
+    # Start the challenge's dashboard aggregates at zero
+    db_challenge.stats = ChallengeStats()
+    
     # Add challenge to database
     session.add(db_challenge)
     session.commit()
@@ -1,129 +1,130 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
-from typing import List, Dict, Any
-import httpx
-import os
-from dotenv import load_dotenv
-import json
-from statistics import mean
-import re
-from functools import lru_cache
+from typing import List, Dict, Any, AsyncIterator, FrozenSet, Iterable, Tuple
+from datetime import datetime
 
 from app.db.database import get_session
-from app.models.models import User, Challenge, Submission
+from app.models.models import User, Challenge, Submission, SubmissionContent, SubmissionFile, ExtractedText
 from app.utils.auth import get_current_active_user, get_current_company_user
+from app.utils.content import decompress_content
 
-# Load environment variables
-load_dotenv()
+# Number of submissions loaded into memory at a time while matching
+SUBMISSION_BATCH_SIZE = 100
 
-# Groq API configuration
-GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_MODEL = "llama3-8b-8192"  # Using Llama 3 8B model which is free and fast
+# Number of suggestions returned
+MAX_SUGGESTIONS = 10
+
+# Number of 0.1-wide match score buckets in a score distribution
+SCORE_HISTOGRAM_BUCKETS = 10
 
 router = APIRouter(
     prefix="/match",
     tags=["AI Match Suggestions"]
 )
 
-# LRU cache to avoid repeated API calls for the same content
-@lru_cache(maxsize=100)
-async def get_embedding_representation(text: str) -> Dict:
-    """
-    Get a semantic representation of text using Groq's LLM.
-    This function extracts key concepts and skills from the text.
-    """
-    if not GROQ_API_KEY:
-        # Fallback if no API key is provided
-        words = re.findall(r'\w+', text.lower())
-        return {word: 1 for word in set(words) if len(word) > 3}
+# Near-duplicate group of a submission: (cluster_id, hashes of its extracted files)
+Group = Tuple[int, FrozenSet[str]]
+
+# Function to get the hashes of the extracted files of some submissions
+def get_file_sets(session: Session, submission_ids: Iterable[int]) -> Dict[int, FrozenSet[str]]:
+    statement = select(SubmissionFile.submission_id, SubmissionFile.blob_hash).join(
+        ExtractedText, ExtractedText.blob_hash == SubmissionFile.blob_hash
+    ).where(
+        SubmissionFile.submission_id.in_(list(submission_ids)),
+        ExtractedText.status == "done"
+    )
+    file_sets: Dict[int, set] = {}
+    for submission_id, blob_hash in session.exec(statement):
+        file_sets.setdefault(submission_id, set()).add(blob_hash)
+    return {submission_id: frozenset(blob_hashes) for submission_id, blob_hashes in file_sets.items()}
+
+# Function to get the company's challenges with their representations
+async def get_challenge_reps(session: Session, company_id: int) -> List[Tuple[Challenge, Dict]]:
+    # Imported here so the matcher and its HTTP client load on first use
+    from app.utils.matcher import get_embedding_representation
     
-    try:
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
+    # Get all challenges for the company
+    statement = select(Challenge).where(Challenge.company_id == company_id)
+    challenges = session.exec(statement).all()
+    
+    # Get challenge representations (skills, concepts, technology requirements)
+    challenge_reps = []
+    for challenge in challenges:
+        challenge_text = f"{challenge.title} {challenge.description}"
+        challenge_reps.append((challenge, await get_embedding_representation(challenge_text)))
+    return challenge_reps
+
+# Function to score other companies' submissions against a company's challenges.
+# Yields (submission_id, group, submission_rep, [(challenge, challenge_rep, score)])
+# once per near-duplicate group, streaming submissions in batches.
+async def iter_match_scores(
+    session: Session,
+    company_id: int,
+    challenge_reps: List[Tuple[Challenge, Dict]]
+) -> AsyncIterator[Tuple[int, Group, Dict, List[Tuple[Challenge, Dict, float]]]]:
+    from app.utils.matcher import get_embedding_representation, calculate_similarity
+    
+    # Near-duplicate groups already scored. Clusters are found from content alone,
+    # so members with different uploaded files form separate groups.
+    scored_groups = set()
+    last_id = 0
+    
+    # Stream submissions in batches instead of loading them all at once
+    while True:
+        statement = select(Submission.id, Submission.cluster_id).join(
+            Challenge, Submission.challenge_id == Challenge.id
+        ).where(
+            Challenge.company_id != company_id,
+            Submission.id > last_id
+        ).order_by(Submission.id).limit(SUBMISSION_BATCH_SIZE)
+        batch = session.exec(statement).all()
         
-        prompt = f"""
-        Extract key skills, technologies, and concepts from this text. 
-        Return a JSON object where keys are the extracted terms and values are 
-        confidence scores between 0 and 1.
+        if not batch:
+            break
+        last_id = batch[-1][0]
         
-        Text: {text}
+        # Score each near-duplicate group once, using its first submission seen
+        file_sets = get_file_sets(session, [submission_id for submission_id, _ in batch])
+        to_score: Dict[int, Group] = {}
+        for submission_id, cluster_id in batch:
+            group = (cluster_id or submission_id, file_sets.get(submission_id, frozenset()))
+            if group not in scored_groups:
+                scored_groups.add(group)
+                to_score[submission_id] = group
         
-        Format your response as valid JSON only, like this:
-        {{
-            "python": 0.9,
-            "data analysis": 0.7
-        }}
-        """
+        if not to_score:
+            continue
         
-        payload = {
-            "model": GROQ_MODEL,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 500
-        }
+        # Get content for the submissions being scored
+        statement = select(SubmissionContent.submission_id, SubmissionContent.data).where(
+            SubmissionContent.submission_id.in_(list(to_score))
+        ).order_by(SubmissionContent.submission_id)
+        contents = session.exec(statement).all()
+        
+        # Get text extracted from files uploaded for this batch
+        statement = select(SubmissionFile.submission_id, ExtractedText.data).join(
+            ExtractedText, ExtractedText.blob_hash == SubmissionFile.blob_hash
+        ).where(
+            SubmissionFile.submission_id.in_(list(to_score)),
+            ExtractedText.status == "done"
+        ).distinct()
+        file_texts: Dict[int, List[str]] = {}
+        for submission_id, data in session.exec(statement):
+            file_texts.setdefault(submission_id, []).append(decompress_content(data))
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                GROQ_API_URL,
-                headers=headers,
-                json=payload,
-                timeout=30.0
-            )
+        for submission_id, data in contents:
+            # Submission content plus the text of its uploaded files
+            submission_text = "\n\n".join([decompress_content(data), *file_texts.get(submission_id, [])])
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                try:
-                    # Extract JSON from the response
-                    json_match = re.search(r'({.*})', content.replace('\n', ''))
-                    if json_match:
-                        return json.loads(json_match.group(1))
-                    return json.loads(content)
-                except json.JSONDecodeError:
-                    # Fallback if JSON parsing fails
-                    words = re.findall(r'\w+', content.lower())
-                    return {word: 1 for word in set(words) if len(word) > 3}
+            # Get submission representation (skills demonstrated, approaches used)
+            submission_rep = await get_embedding_representation(submission_text)
             
-        # Fallback
-        return {"error": 1.0}
-        
-    except Exception as e:
-        print(f"Error in LLM processing: {str(e)}")
-        # Fallback to simple keyword extraction if API call fails
-        words = re.findall(r'\w+', text.lower())
-        return {word: 1 for word in set(words) if len(word) > 3}
-
-async def calculate_similarity(challenge_rep: Dict, submission_rep: Dict) -> float:
-    """
-    Calculate similarity between challenge and submission representations
-    using a combination of keyword matching and weighted scoring.
-    """
-    if not challenge_rep or not submission_rep:
-        return 0.0
-    
-    # Find common terms and calculate weighted scores
-    common_terms = set(challenge_rep.keys()) & set(submission_rep.keys())
-    if not common_terms:
-        return 0.0
-    
-    # Calculate similarities for common terms
-    similarities = []
-    for term in common_terms:
-        # Weighted by the product of both confidence scores
-        weight = challenge_rep[term] * submission_rep[term]
-        similarities.append(weight)
-    
-    # Calculate match score (average of weighted similarities)
-    match_score = mean(similarities) if similarities else 0.0
-    
-    # Scale score based on coverage (how many terms match relative to challenge terms)
-    coverage = len(common_terms) / len(challenge_rep) if challenge_rep else 0
-    final_score = match_score * (0.7 + 0.3 * coverage)
-    
-    return min(final_score, 1.0)  # Cap at 1.0
+            scores = []
+            for challenge, challenge_rep in challenge_reps:
+                # Calculate similarity score
+                scores.append((challenge, challenge_rep, await calculate_similarity(challenge_rep, submission_rep)))
+            
+            yield submission_id, to_score[submission_id], submission_rep, scores
 
 @router.get("/suggestions", response_model=List[Dict[str, Any]])
 async def get_match_suggestions(
@@ -134,42 +135,25 @@ async def get_match_suggestions(
     AI-based match suggestions between challenges and submissions.
     Uses semantic analysis via LLM to find the best matches.
     """
-    # Get all challenges for the current company
-    statement = select(Challenge).where(Challenge.company_id == current_user.id)
-    challenges = session.exec(statement).all()
-    
-    # Get all submissions
-    statement = select(Submission).join(
-        Challenge, Submission.challenge_id == Challenge.id
-    ).where(Challenge.company_id != current_user.id)
-    submissions = session.exec(statement).all()
+    challenge_reps = await get_challenge_reps(session, current_user.id)
     
-    if not challenges or not submissions:
+    if not challenge_reps:
         return []
     
-    # Process and analyze all challenges and submissions
     suggestions = []
+    submission_groups: Dict[int, Group] = {}
     
-    # Process each challenge-submission pair
-    for challenge in challenges:
-        # Get challenge representation (skills, concepts, technology requirements)
-        challenge_text = f"{challenge.title} {challenge.description}"
-        challenge_rep = await get_embedding_representation(challenge_text)
+    async for submission_id, group, submission_rep, scores in iter_match_scores(session, current_user.id, challenge_reps):
+        submission_groups[submission_id] = group
         
-        for submission in submissions:
-            # Get submission representation (skills demonstrated, approaches used)
-            submission_rep = await get_embedding_representation(submission.content)
-            
-            # Calculate similarity score
-            match_score = await calculate_similarity(challenge_rep, submission_rep)
-            
+        for challenge, challenge_rep, match_score in scores:
             # Only include if the match is reasonably good
             if match_score > 0.3:
                 # Find matched terms for explanation
                 common_terms = set(challenge_rep.keys()) & set(submission_rep.keys())
                 top_matches = sorted(
                     [(term, challenge_rep[term] * submission_rep[term]) for term in common_terms],
-                    key=lambda x: x[1], 
+                    key=lambda x: x[1],
                     reverse=True
                 )[:3]  # Top 3 matching skills/concepts
                 
@@ -178,11 +162,72 @@ async def get_match_suggestions(
                 suggestions.append({
                     "challenge_id": challenge.id,
                     "challenge_title": challenge.title,
-                    "submission_id": submission.id,
+                    "submission_id": submission_id,
                     "match_score": round(match_score, 2),
                     "match_reason": f"Skills/concepts match: {match_reason}"
                 })
+        
+        # Keep only the current top suggestions as submissions stream in
+        if len(suggestions) > SUBMISSION_BATCH_SIZE:
+            suggestions.sort(key=lambda x: x["match_score"], reverse=True)
+            suggestions = suggestions[:MAX_SUGGESTIONS]
     
-    # Sort by match score and return top 10
     suggestions.sort(key=lambda x: x["match_score"], reverse=True)
-    return suggestions[:10] 
\ No newline at end of file
+    suggestions = suggestions[:MAX_SUGGESTIONS]
+    
+    # Collapse near-duplicates (same content cluster and files) into the suggestion for their group
+    clusters = {submission_groups[s["submission_id"]][0] for s in suggestions}
+    statement = select(Submission.id, Submission.cluster_id).join(
+        Challenge, Submission.challenge_id == Challenge.id
+    ).where(
+        Challenge.company_id != current_user.id,
+        Submission.cluster_id.in_(clusters)
+    ).order_by(Submission.id)
+    members_by_cluster = session.exec(statement).all()
+    file_sets = get_file_sets(session, [submission_id for submission_id, _ in members_by_cluster])
+    group_members: Dict[Group, List[int]] = {}
+    for submission_id, cluster_id in members_by_cluster:
+        group = (cluster_id, file_sets.get(submission_id, frozenset()))
+        group_members.setdefault(group, []).append(submission_id)
+    
+    for suggestion in suggestions:
+        members = group_members.get(submission_groups[suggestion["submission_id"]], [])
+        suggestion["duplicate_submission_ids"] = [
+            submission_id for submission_id in members if submission_id != suggestion["submission_id"]
+        ]
+    
+    return suggestions
+
+@router.get("/score-distribution", response_model=List[Dict[str, Any]])
+async def get_match_score_distribution(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_company_user)
+):
+    """
+    Distribution of match scores for each of the current company's challenges.
+    A snapshot computed by running the matcher on request; it is not stored.
+    Scores other companies' submissions against each challenge in 0.1-wide
+    buckets, once per near-duplicate group, like /match/suggestions.
+    """
+    challenge_reps = await get_challenge_reps(session, current_user.id)
+    
+    score_histograms = {challenge.id: [0] * SCORE_HISTOGRAM_BUCKETS for challenge, _ in challenge_reps}
+    scored_groups = 0
+    
+    async for _, _, _, scores in iter_match_scores(session, current_user.id, challenge_reps):
+        scored_groups += 1
+        for challenge, _, match_score in scores:
+            bucket = min(int(match_score * SCORE_HISTOGRAM_BUCKETS), SCORE_HISTOGRAM_BUCKETS - 1)
+            score_histograms[challenge.id][bucket] += 1
+    
+    scored_at = datetime.utcnow()
+    return [
+        {
+            "challenge_id": challenge.id,
+            "challenge_title": challenge.title,
+            "score_histogram": score_histograms[challenge.id],
+            "scored_groups": scored_groups,
+            "scored_at": scored_at
+        }
+        for challenge, _ in challenge_reps
+    ]
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from typing import Dict
+
+from app.core.admission import admission_controller
+from app.models.models import User
+from app.utils.auth import get_current_company_user
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+@router.get("/admission", response_model=Dict[str, Dict[str, int]])
+def get_admission_metrics(
+    current_user: User = Depends(get_current_company_user)
+):
+    """
+    Active requests, queue depth and shed/rate-limited counts per route class
+    for the worker that serves this request.
+    """
+    return admission_controller.snapshot()
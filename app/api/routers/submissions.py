@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional, Literal, Iterator
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import zlib
 
-from app.db.database import get_session
-from app.models.models import User, Challenge, Submission
+from app.db.database import engine, get_session
+from app.db.duplicates import assign_duplicate_cluster
+from app.db.rollup import record_submission
+from app.models.models import User, Challenge, Submission, SubmissionContent
 from app.schemas.submission import SubmissionCreate, SubmissionResponse, SubmissionWithChallenge
 from app.utils.auth import get_current_active_user, get_current_candidate_user, get_current_company_user
+from app.utils.content import make_preview, compress_content, decompress_content
 
 router = APIRouter(
     prefix="/submissions",
     tags=["Submissions"]
 )
 
+# Rows fetched from the database cursor at a time during export
+EXPORT_BATCH_SIZE = 500
+
+# Columns included in exports
+EXPORT_FIELDS = ["id", "challenge_id", "challenge_title", "candidate_id", "candidate_email", "timestamp", "content"]
+
 @router.post("/", response_model=SubmissionResponse, status_code=status.HTTP_201_CREATED)
 def create_submission(
     submission: SubmissionCreate,
@@ -30,24 +45,39 @@ def create_submission(
     
     # Create new submission
     db_submission = Submission(
-        content=submission.content,
+        content_preview=make_preview(submission.content),
+        content_length=len(submission.content),
         candidate_id=current_user.id,
         challenge_id=submission.challenge_id
     )
     
+    # Store the full content compressed in its own table
+    db_submission.body = SubmissionContent(data=compress_content(submission.content))
+    
     # Add submission to database
     session.add(db_submission)
+    session.flush()
+    
+    # Record the submission in the near-duplicate index
+    assign_duplicate_cluster(session, db_submission, submission.content)
+    
+    # Update the challenge's dashboard aggregates in the same transaction
+    record_submission(session, db_submission)
+    
     session.commit()
     session.refresh(db_submission)
     
-    return db_submission
+    submission_dict = db_submission.dict()
+    submission_dict["content"] = submission.content
+    
+    return submission_dict
 
 @router.get("/", response_model=List[SubmissionWithChallenge])
 def get_all_submissions(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_company_user)
 ):
-    # Get all submissions with challenge title
+    # Get all submissions with challenge title (content is not loaded)
     statement = select(Submission, Challenge.title).join(
         Challenge, Submission.challenge_id == Challenge.id
     )
@@ -67,7 +97,7 @@ def get_my_submissions(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_candidate_user)
 ):
-    # Get all submissions for current user with challenge title
+    # Get all submissions for current user with challenge title (content is not loaded)
     statement = select(Submission, Challenge.title).join(
         Challenge, Submission.challenge_id == Challenge.id
     ).where(Submission.candidate_id == current_user.id)
@@ -80,4 +110,151 @@ def get_my_submissions(
         submission_dict["challenge_title"] = challenge_title
         submissions.append(submission_dict)
     
-    return submissions 
\ No newline at end of file
+    return submissions
+
+# Function to convert a timestamp filter to naive UTC, the form submission timestamps are stored in
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# Function to format one export row
+def format_export_row(row) -> dict:
+    return dict(zip(EXPORT_FIELDS, (*row[:5], row[5].isoformat(), decompress_content(row[6]))))
+
+# Function to stream export rows for a company, one batch at a time
+def iter_export_rows(
+    company_id: int,
+    challenge_id: Optional[int],
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> Iterator[List[dict]]:
+    statement = select(
+        Submission.id, Submission.challenge_id, Challenge.title, Submission.candidate_id,
+        User.email, Submission.timestamp, SubmissionContent.data
+    ).join(
+        Challenge, Submission.challenge_id == Challenge.id
+    ).join(
+        User, Submission.candidate_id == User.id
+    ).join(
+        SubmissionContent, SubmissionContent.submission_id == Submission.id
+    ).where(Challenge.company_id == company_id)
+    
+    if challenge_id is not None:
+        statement = statement.where(Submission.challenge_id == challenge_id)
+    if since is not None:
+        statement = statement.where(Submission.timestamp >= to_naive_utc(since))
+    if until is not None:
+        statement = statement.where(Submission.timestamp < to_naive_utc(until))
+    
+    statement = statement.order_by(Submission.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    # The request session is closed before the response body is sent,
+    # so the export holds its own session for the duration of the stream
+    with Session(engine) as session:
+        result = session.exec(statement)
+        
+        # Send the first row on its own so the response starts immediately
+        first = result.fetchmany(1)
+        if first:
+            yield [format_export_row(first[0])]
+        
+        for partition in result.partitions():
+            yield [format_export_row(row) for row in partition]
+
+# Function to encode export batches as NDJSON
+def encode_ndjson(batches: Iterator[List[dict]]) -> Iterator[bytes]:
+    for rows in batches:
+        yield "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+# Function to encode export batches as CSV
+def encode_csv(batches: Iterator[List[dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+    
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+# Function to gzip a byte stream, flushing after every chunk so output keeps streaming
+def gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+@router.get("/export")
+def export_submissions(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    challenge_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gzip: bool = False,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_company_user)
+):
+    """
+    Stream submissions to the current company's challenges as NDJSON or CSV.
+    """
+    # Check if challenge exists and belongs to the current company
+    if challenge_id is not None:
+        statement = select(Challenge.id).where(
+            Challenge.id == challenge_id,
+            Challenge.company_id == current_user.id
+        )
+        if not session.exec(statement).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Challenge with ID {challenge_id} not found or you don't have permission to export it"
+            )
+    
+    batches = iter_export_rows(current_user.id, challenge_id, since, until)
+    
+    if export_format == "csv":
+        body = encode_csv(batches)
+        media_type = "text/csv"
+    else:
+        body = encode_ndjson(batches)
+        media_type = "application/x-ndjson"
+    
+    headers = {"Content-Disposition": f"attachment; filename=submissions.{export_format}"}
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+@router.get("/{submission_id}", response_model=SubmissionResponse)
+def get_submission(
+    submission_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    # Get submission with its full content
+    statement = select(Submission, SubmissionContent.data).join(
+        SubmissionContent, SubmissionContent.submission_id == Submission.id
+    ).where(Submission.id == submission_id)
+    
+    # Candidates can only read their own submissions
+    if current_user.role != "company":
+        statement = statement.where(Submission.candidate_id == current_user.id)
+    
+    result = session.exec(statement).first()
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Submission with ID {submission_id} not found"
+        )
+    
+    submission, data = result
+    
+    # Format result
+    submission_dict = submission.dict()
+    submission_dict["content"] = decompress_content(data)
+    
+    return submission_dict
@@ -1,29 +1,153 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from typing import List
+from typing import BinaryIO, Dict, List, Set
+import asyncio
+import hashlib
 import os
 import shutil
 from pathlib import Path
 
-from app.db.database import get_session
-from app.models.models import User, Challenge, Submission
+from app.core.config import settings
+from app.db.database import engine, get_session
+from app.models.models import User, Challenge, Submission, SubmissionFile, ExtractedText
 from app.utils.auth import get_current_active_user, get_current_candidate_user, get_current_company_user
+from app.utils.content import compress_content
+from app.utils.extraction import (
+    ExtractionTimeout, extract_text_with_timeout, get_extraction_pool, shutdown_extraction_pool
+)
 
 router = APIRouter(
     prefix="/upload",
     tags=["File Uploads"]
 )
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Upload directories (created on first upload)
+UPLOAD_DIR = settings.upload_dir
 
-# Create subdirectories for different types of uploads
+# Subdirectories for different types of uploads
 CHALLENGE_ATTACHMENTS_DIR = UPLOAD_DIR / "challenge_attachments"
-CHALLENGE_ATTACHMENTS_DIR.mkdir(exist_ok=True)
-
 SUBMISSION_FILES_DIR = UPLOAD_DIR / "submission_files"
-SUBMISSION_FILES_DIR.mkdir(exist_ok=True)
+
+# Bytes copied from an upload at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Running extraction tasks (the event loop only keeps weak references to tasks),
+# and the blob hashes they are extracting
+_extraction_tasks: Set[asyncio.Task] = set()
+_extracting_blobs: Set[str] = set()
+
+# Retry policy for failed or timed-out extractions
+MAX_EXTRACTION_ATTEMPTS = 3
+EXTRACTION_SWEEP_INTERVAL = 300  # seconds between retry sweeps
+EXTRACTION_SWEEP_LIMIT = 100  # blobs scheduled per sweep
+
+# Function to hash and write one chunk of an upload
+def write_upload_chunk(buffer: BinaryIO, hasher, chunk: bytes):
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+# Function to store the outcome of extracting a blob, keeping earlier successes
+def store_extracted_text(blob_hash: str, text: str, status: str = "done"):
+    with Session(engine) as session:
+        extracted = session.get(ExtractedText, blob_hash)
+        if extracted is None:
+            session.add(ExtractedText(
+                blob_hash=blob_hash,
+                data=compress_content(text),
+                text_length=len(text),
+                status=status
+            ))
+        elif extracted.status == "done":
+            return
+        else:
+            # Retry of an earlier failure
+            extracted.data = compress_content(text)
+            extracted.text_length = len(text)
+            extracted.status = status
+            extracted.attempts += 1
+            extracted.extracted_at = datetime.utcnow()
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another upload of the same contents was extracted first
+            session.rollback()
+
+# Function to extract text from an uploaded file in the process pool and store it
+async def extract_submission_file(blob_hash: str, file_path: Path):
+    # The time limit is applied inside the worker, from when it starts on this file
+    try:
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(get_extraction_pool(), extract_text_with_timeout, str(file_path))
+        status = "done"
+    except ExtractionTimeout:
+        print(f"Text extraction timed out for {file_path.name}")
+        text, status = "", "timeout"
+    except BrokenProcessPool:
+        # A worker died; start a new pool for the next file
+        print(f"Extraction worker died while extracting {file_path.name}")
+        shutdown_extraction_pool()
+        text, status = "", "failed"
+    except Exception as e:
+        print(f"Error in text extraction: {str(e)}")
+        text, status = "", "failed"
+    
+    try:
+        await run_in_threadpool(store_extracted_text, blob_hash, text, status)
+    except Exception as e:
+        print(f"Error storing extracted text: {str(e)}")
+
+# Function to start extraction without tying it to the request
+def schedule_extraction(blob_hash: str, file_path: Path):
+    if blob_hash in _extracting_blobs:
+        return
+    _extracting_blobs.add(blob_hash)
+    
+    # Background tasks would run inside the response, holding the request's admission slot
+    task = asyncio.create_task(extract_submission_file(blob_hash, file_path))
+    _extraction_tasks.add(task)
+    task.add_done_callback(_extraction_tasks.discard)
+    task.add_done_callback(lambda _: _extracting_blobs.discard(blob_hash))
+
+# Function to find blobs to extract again: failed or timed-out extractions with
+# attempts left, and uploads whose extraction was lost (e.g. by a restart)
+def find_extraction_retries(limit: int = EXTRACTION_SWEEP_LIMIT) -> Dict[str, str]:
+    with Session(engine) as session:
+        failed = select(SubmissionFile.blob_hash, SubmissionFile.path).join(
+            ExtractedText, ExtractedText.blob_hash == SubmissionFile.blob_hash
+        ).where(
+            ExtractedText.status != "done",
+            ExtractedText.attempts < MAX_EXTRACTION_ATTEMPTS
+        ).limit(limit)
+        
+        # Uploads from the last sweep interval may still be extracting
+        cutoff = datetime.utcnow() - timedelta(seconds=EXTRACTION_SWEEP_INTERVAL)
+        lost = select(SubmissionFile.blob_hash, SubmissionFile.path).outerjoin(
+            ExtractedText, ExtractedText.blob_hash == SubmissionFile.blob_hash
+        ).where(
+            ExtractedText.blob_hash.is_(None),
+            SubmissionFile.uploaded_at < cutoff
+        ).limit(limit)
+        
+        retries = {}
+        for blob_hash, path in [*session.exec(failed), *session.exec(lost)]:
+            retries.setdefault(blob_hash, path)
+        return retries
+
+# Function to retry failed extractions periodically (runs for the app's lifetime)
+async def sweep_extractions():
+    while True:
+        await asyncio.sleep(EXTRACTION_SWEEP_INTERVAL)
+        try:
+            retries = await run_in_threadpool(find_extraction_retries)
+        except Exception as e:
+            print(f"Error finding extractions to retry: {str(e)}")
+            continue
+        for blob_hash, path in retries.items():
+            schedule_extraction(blob_hash, Path(path))
 
 @router.post("/challenge/{challenge_id}/attachment")
 async def upload_challenge_attachment(
@@ -50,7 +174,7 @@ async def upload_challenge_attachment(
     
     # Create directory for this challenge if it doesn't exist
     challenge_dir = CHALLENGE_ATTACHMENTS_DIR / str(challenge_id)
-    challenge_dir.mkdir(exist_ok=True)
+    challenge_dir.mkdir(parents=True, exist_ok=True)
     
     # Save file
     file_path = challenge_dir / file.filename
@@ -88,15 +212,35 @@ async def upload_submission_file(
     
     # Create directory for this submission if it doesn't exist
     submission_dir = SUBMISSION_FILES_DIR / str(submission_id)
-    submission_dir.mkdir(exist_ok=True)
+    submission_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save file
+    # Save file, hashing its contents as it is written
     file_path = submission_dir / file.filename
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    hasher = hashlib.sha256()
+    buffer = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await run_in_threadpool(write_upload_chunk, buffer, hasher, chunk)
+    finally:
+        await run_in_threadpool(buffer.close)
+    blob_hash = hasher.hexdigest()
+    
+    # Record the file against the submission
+    session.add(SubmissionFile(
+        submission_id=submission_id,
+        filename=file.filename,
+        path=str(file_path),
+        blob_hash=blob_hash
+    ))
+    session.commit()
+    
+    # Extract text in the background, unless these contents were seen before
+    if session.get(ExtractedText, blob_hash) is None:
+        schedule_extraction(blob_hash, file_path)
     
     return {
         "filename": file.filename,
         "path": str(file_path),
+        "blob_hash": blob_hash,
         "message": "File uploaded successfully"
     } 
\ No newline at end of file
@@ -0,0 +1,213 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+# Limits for one class of routes. Limits apply per worker process.
+@dataclass
+class RouteClassConfig:
+    max_concurrent: int  # requests handled at the same time
+    max_queue: int  # requests allowed to wait for a slot
+    queue_timeout: float  # seconds a request may wait before it is shed
+    rate_per_minute: int  # requests per user per minute
+    burst: int  # requests a user may make back to back
+    retry_after: int  # seconds suggested to shed clients
+
+# Route classes, from most to least specific match
+ROUTE_CLASSES: Dict[str, RouteClassConfig] = {
+    "auth": RouteClassConfig(max_concurrent=8, max_queue=16, queue_timeout=5.0, rate_per_minute=20, burst=10, retry_after=2),
+    "uploads": RouteClassConfig(max_concurrent=4, max_queue=8, queue_timeout=10.0, rate_per_minute=30, burst=5, retry_after=5),
+    "matching": RouteClassConfig(max_concurrent=2, max_queue=4, queue_timeout=5.0, rate_per_minute=6, burst=2, retry_after=30),
+    "exports": RouteClassConfig(max_concurrent=2, max_queue=4, queue_timeout=5.0, rate_per_minute=10, burst=3, retry_after=30),
+    "writes": RouteClassConfig(max_concurrent=16, max_queue=32, queue_timeout=5.0, rate_per_minute=120, burst=20, retry_after=1),
+    "reads": RouteClassConfig(max_concurrent=32, max_queue=64, queue_timeout=2.0, rate_per_minute=300, burst=50, retry_after=1),
+}
+
+# Paths that bypass admission control
+EXEMPT_PATHS = {"/metrics/admission"}
+
+# Maximum number of users tracked for rate limiting
+MAX_TRACKED_USERS = 10000
+
+# Function to map a request to its route class
+def classify_request(method: str, path: str) -> str:
+    if path.startswith("/auth"):
+        return "auth"
+    if path.startswith("/upload"):
+        return "uploads"
+    if path.startswith("/match"):
+        return "matching"
+    if path.startswith("/submissions/export"):
+        return "exports"
+    if method not in ("GET", "HEAD", "OPTIONS"):
+        return "writes"
+    return "reads"
+
+# Token bucket for one user and route class
+@dataclass
+class TokenBucket:
+    tokens: float
+    updated: float
+
+# Concurrency limit, wait queue and per-user rate limits for one route class
+@dataclass
+class RouteClassLimiter:
+    name: str
+    config: RouteClassConfig
+    active: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    shed: int = 0
+    rate_limited: int = 0
+    _slots: asyncio.Semaphore = field(init=False)
+    _buckets: "OrderedDict[str, TokenBucket]" = field(init=False, default_factory=OrderedDict)
+
+    def __post_init__(self):
+        self._slots = asyncio.Semaphore(self.config.max_concurrent)
+
+    def check_rate(self, identity: str) -> Optional[int]:
+        """
+        Take one token from the user's bucket.
+        Returns None if allowed, otherwise the seconds until a token is available.
+        """
+        now = time.monotonic()
+        rate = self.config.rate_per_minute / 60.0
+        bucket = self._buckets.pop(identity, None)
+        if bucket is None:
+            bucket = TokenBucket(tokens=float(self.config.burst), updated=now)
+        else:
+            bucket.tokens = min(self.config.burst, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+        # Most recently seen users stay at the end; evict the oldest
+        self._buckets[identity] = bucket
+        if len(self._buckets) > MAX_TRACKED_USERS:
+            self._buckets.popitem(last=False)
+
+        if bucket.tokens < 1:
+            self.rate_limited += 1
+            return max(1, math.ceil((1 - bucket.tokens) / rate))
+        bucket.tokens -= 1
+        return None
+
+    def refund_rate(self, identity: str):
+        """
+        Return the token taken by check_rate, for a request that was shed.
+        """
+        bucket = self._buckets.get(identity)
+        if bucket is not None:
+            bucket.tokens = min(self.config.burst, bucket.tokens + 1)
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a free slot. Returns False if the queue is full or the wait times out.
+        """
+        if self._slots.locked() and self.waiting >= self.config.max_queue:
+            self.shed += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_concurrent": self.config.max_concurrent,
+            "max_queue": self.config.max_queue,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "rate_limited": self.rate_limited,
+        }
+
+# Holds the limiter for every route class
+class AdmissionController:
+    def __init__(self, route_classes: Dict[str, RouteClassConfig]):
+        self.limiters = {
+            name: RouteClassLimiter(name=name, config=config)
+            for name, config in route_classes.items()
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+admission_controller = AdmissionController(ROUTE_CLASSES)
+
+# Function to identify the caller: the token subject if valid, otherwise the client address
+def get_request_identity(scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+                    if payload.get("sub"):
+                        return f"user:{payload['sub']}"
+                except JWTError:
+                    pass
+            break
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "ip:unknown"
+
+# ASGI middleware applying admission control per route class
+class AdmissionControlMiddleware:
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.limiters[classify_request(scope["method"], scope["path"])]
+
+        # Per-user rate limit
+        identity = get_request_identity(scope)
+        retry_after = limiter.check_rate(identity)
+        if retry_after is not None:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded. Please retry later."},
+                headers={"Retry-After": str(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        # Bounded wait for a concurrency slot
+        if not await limiter.acquire():
+            # Shed requests do not count against the caller's rate budget
+            limiter.refund_rate(identity)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy. Please retry later."},
+                headers={"Retry-After": str(limiter.config.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from dotenv import load_dotenv
+import os
+
+# Application settings, read from the environment (and .env) once per process
+@dataclass(frozen=True)
+class Settings:
+    secret_key: str
+    algorithm: str
+    access_token_expire_minutes: int
+    database_url: str
+    groq_api_key: str
+    upload_dir: Path
+    extraction_workers: int
+
+# Function to get the application settings
+@lru_cache
+def get_settings() -> Settings:
+    load_dotenv()
+    return Settings(
+        secret_key=os.getenv("SECRET_KEY", "your_secret_key_here"),
+        algorithm=os.getenv("ALGORITHM", "HS256"),
+        access_token_expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+        database_url=os.getenv("DATABASE_URL", "sqlite:///./skills_platform.db"),
+        groq_api_key=os.getenv("GROQ_API_KEY", ""),
+        upload_dir=Path(os.getenv("UPLOAD_DIR", "uploads")),
+        extraction_workers=int(os.getenv("EXTRACTION_WORKERS", "2")),
+    )
+
+settings = get_settings()
@@ -1,24 +1,34 @@
+from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine, Session
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
+from app.core.config import settings
 
-# Get database URL from environment variables
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./skills_platform.db")
+# SQLite connections are shared across threadpool workers
+connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 
 # Create SQLModel engine
 engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    settings.database_url, 
+    connect_args=connect_args
 )
 
+# Function to switch SQLite to write-ahead logging, so a long read (such as a
+# streaming export) does not lock out writes for its whole duration
+def enable_sqlite_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", enable_sqlite_wal)
+
 # Function to create database tables
 def create_db_and_tables():
+    # Import models so their tables are registered on the metadata
+    import app.models.models  # noqa: F401
     SQLModel.metadata.create_all(engine)
 
 # Function to get database session
 def get_session():
     with Session(engine) as session:
-        yield session 
\ No newline at end of file
+        yield session
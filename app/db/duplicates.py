@@ -0,0 +1,67 @@
+"""
+Near-duplicate clustering of submissions by MinHash/LSH.
+
+Only cluster representatives (submissions whose `cluster_id` is their own id)
+are indexed in `submissionlshband`, so finding a new submission's cluster
+compares it with at most one submission per similar cluster, however many
+copies that cluster already has.
+"""
+from sqlalchemy import delete
+from sqlmodel import Session, select, or_, and_
+
+from app.models.models import Submission, SubmissionLSHBand
+from app.utils.minhash import (
+    compute_signature,
+    band_keys,
+    estimate_similarity,
+    pack_signature,
+    unpack_signature,
+    NEAR_DUPLICATE_THRESHOLD
+)
+
+# Most cluster representatives compared with a new submission
+MAX_CLUSTER_CANDIDATES = 50
+
+# Function to assign a new, flushed submission's near-duplicate cluster (caller commits)
+def assign_duplicate_cluster(session: Session, submission: Submission, content: str):
+    signature = compute_signature(content)
+    
+    # Content without words is not indexed; it would match every other such submission
+    if signature is None:
+        submission.cluster_id = submission.id
+        return
+    
+    keys = band_keys(signature)
+    submission.minhash = pack_signature(signature)
+    
+    # Find cluster representatives sharing at least one LSH band bucket
+    statement = select(Submission.id, Submission.minhash).join(
+        SubmissionLSHBand, SubmissionLSHBand.submission_id == Submission.id
+    ).where(
+        or_(*[
+            and_(SubmissionLSHBand.band == band, SubmissionLSHBand.bucket == key)
+            for band, key in enumerate(keys)
+        ]),
+        Submission.cluster_id == Submission.id
+    ).distinct().limit(MAX_CLUSTER_CANDIDATES)
+    
+    # Join the most similar cluster above the threshold
+    best_similarity = NEAR_DUPLICATE_THRESHOLD
+    cluster_id = submission.id
+    for candidate_id, candidate_minhash in session.exec(statement):
+        similarity = estimate_similarity(signature, unpack_signature(candidate_minhash))
+        if similarity >= best_similarity:
+            best_similarity = similarity
+            cluster_id = candidate_id
+    submission.cluster_id = cluster_id
+    
+    # Index the submission only if it starts a new cluster
+    if cluster_id == submission.id:
+        for band, key in enumerate(keys):
+            session.add(SubmissionLSHBand(band=band, bucket=key, submission_id=submission.id))
+
+# Function to remove index entries of submissions that are not cluster representatives
+def prune_duplicate_bands(session: Session) -> int:
+    non_representatives = select(Submission.id).where(Submission.cluster_id != Submission.id)
+    statement = delete(SubmissionLSHBand).where(SubmissionLSHBand.submission_id.in_(non_representatives))
+    return session.execute(statement).rowcount
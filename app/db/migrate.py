@@ -0,0 +1,148 @@
+"""
+One-time schema setup. Run before starting the API workers:
+
+    python -m app.db.migrate
+
+Creates missing tables, adds columns that were added to existing models,
+moves submission content from the old `submission.content` column into the
+compressed `submissioncontent` table, assigns near-duplicate clusters to
+submissions created before clustering existed, and builds dashboard aggregates
+for challenges that have none.
+"""
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session, select
+
+from app.db.database import engine, create_db_and_tables
+from app.db.duplicates import assign_duplicate_cluster, prune_duplicate_bands
+from app.db.rollup import compute_challenge_stats
+from app.models.models import Challenge, ChallengeStats, Submission, SubmissionContent
+from app.utils.content import make_preview, compress_content, decompress_content
+
+# Rows of legacy submission content moved per transaction
+CONTENT_BATCH_SIZE = 500
+
+# Submissions clustered per transaction
+CLUSTER_BATCH_SIZE = 500
+
+# Challenges whose aggregates are built per transaction
+STATS_BATCH_SIZE = 500
+
+# Function to add model columns and indexes that are missing from existing tables
+def add_missing_columns():
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+
+                # NOT NULL columns need a default for the rows already in the table
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if default is not None:
+                    literal = str(int(default)) if isinstance(default, (bool, int)) else "'" + str(default).replace("'", "''") + "'"
+                    ddl += f" DEFAULT {literal}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+
+                connection.execute(text(ddl))
+                print(f"Added column {table.name}.{column.name}")
+
+            # Indexes declared on existing tables are not created by create_all
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    print(f"Created index {index.name}")
+
+# Function to move legacy submission content into the submissioncontent table
+def migrate_submission_content():
+    columns = {column["name"] for column in inspect(engine).get_columns("submission")}
+    if "content" not in columns:
+        return
+
+    moved = 0
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            rows = session.execute(
+                text("SELECT id, content FROM submission WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": CONTENT_BATCH_SIZE}
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            for submission_id, content in rows:
+                content = content or ""
+                if session.get(SubmissionContent, submission_id) is None:
+                    session.add(SubmissionContent(submission_id=submission_id, data=compress_content(content)))
+                session.execute(
+                    text("UPDATE submission SET content_preview = :preview, content_length = :length WHERE id = :id"),
+                    {"preview": make_preview(content), "length": len(content), "id": submission_id}
+                )
+            session.commit()
+            moved += len(rows)
+
+    # The old NOT NULL column would make every new insert fail
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE submission DROP COLUMN content"))
+    print(f"Moved content of {moved} submissions into submissioncontent")
+
+# Function to cluster submissions that have no near-duplicate cluster yet, oldest first
+def backfill_duplicate_clusters():
+    clustered = 0
+    while True:
+        with Session(engine) as session:
+            statement = select(Submission, SubmissionContent.data).join(
+                SubmissionContent, SubmissionContent.submission_id == Submission.id
+            ).where(Submission.cluster_id.is_(None)).order_by(Submission.id).limit(CLUSTER_BATCH_SIZE)
+            rows = session.exec(statement).all()
+            if not rows:
+                break
+
+            # Each submission sees the clusters started earlier in the batch (autoflush)
+            for submission, data in rows:
+                assign_duplicate_cluster(session, submission, decompress_content(data))
+            session.commit()
+            clustered += len(rows)
+
+    # Index entries from before only representatives were indexed
+    with Session(engine) as session:
+        pruned = prune_duplicate_bands(session)
+        session.commit()
+
+    if clustered or pruned:
+        print(f"Clustered {clustered} submissions, pruned {pruned} index entries")
+
+# Function to build dashboard aggregates for challenges that have no stats row
+def create_missing_challenge_stats():
+    created = 0
+    while True:
+        with Session(engine) as session:
+            statement = select(Challenge.id).outerjoin(
+                ChallengeStats, ChallengeStats.challenge_id == Challenge.id
+            ).where(ChallengeStats.challenge_id.is_(None)).order_by(Challenge.id).limit(STATS_BATCH_SIZE)
+            challenge_ids = session.exec(statement).all()
+            if not challenge_ids:
+                break
+
+            session.add_all(compute_challenge_stats(session, challenge_ids).values())
+            session.commit()
+            created += len(challenge_ids)
+
+    if created:
+        print(f"Built aggregates for {created} challenges")
+
+def main():
+    create_db_and_tables()
+    add_missing_columns()
+    migrate_submission_content()
+    backfill_duplicate_clusters()
+    create_missing_challenge_stats()
+    print("Database schema is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Per-challenge dashboard aggregates.
+
+Counts are updated in the same transaction as each new submission, and the
+migration builds them for challenges that have none. To repair drift, run:
+
+    python -m app.db.rollup
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import update, case, exists
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from app.db.database import engine
+from app.models.models import Challenge, ChallengeStats, Submission
+
+# Function to compute aggregates for some challenges from their submissions
+def compute_challenge_stats(
+    session: Session,
+    challenge_ids: List[int],
+    exclude_submission_id: Optional[int] = None
+) -> Dict[int, ChallengeStats]:
+    statement = select(
+        Submission.challenge_id,
+        func.count(Submission.id),
+        func.count(func.distinct(Submission.candidate_id)),
+        func.max(Submission.timestamp)
+    ).where(Submission.challenge_id.in_(challenge_ids)).group_by(Submission.challenge_id)
+    if exclude_submission_id is not None:
+        statement = statement.where(Submission.id != exclude_submission_id)
+
+    stats = {challenge_id: ChallengeStats(challenge_id=challenge_id) for challenge_id in challenge_ids}
+    for challenge_id, submission_count, candidate_count, latest_submission_at in session.exec(statement):
+        stats[challenge_id].submission_count = submission_count
+        stats[challenge_id].candidate_count = candidate_count
+        stats[challenge_id].latest_submission_at = latest_submission_at
+    return stats
+
+# Function to create a challenge's aggregates row if it does not exist yet
+def ensure_challenge_stats(session: Session, challenge_id: int, exclude_submission_id: Optional[int] = None):
+    statement = select(ChallengeStats.challenge_id).where(ChallengeStats.challenge_id == challenge_id)
+    if session.exec(statement).first() is not None:
+        return
+
+    computed = compute_challenge_stats(session, [challenge_id], exclude_submission_id)[challenge_id]
+    values = {
+        "challenge_id": challenge_id,
+        "submission_count": computed.submission_count,
+        "candidate_count": computed.candidate_count,
+        "latest_submission_at": computed.latest_submission_at,
+    }
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(ChallengeStats).values(**values).on_conflict_do_nothing(
+            index_elements=["challenge_id"]
+        )
+        session.execute(statement)
+        return
+
+    # Other databases: insert in a savepoint and ignore a concurrent insert
+    try:
+        with session.begin_nested():
+            session.add(ChallengeStats(**values))
+    except IntegrityError:
+        pass
+
+# Function to add a new, flushed submission to its challenge's aggregates (caller commits)
+def record_submission(session: Session, submission: Submission):
+    # Challenges from before the aggregates existed start from their other submissions
+    ensure_challenge_stats(session, submission.challenge_id, exclude_submission_id=submission.id)
+
+    # Lock the row so the statement below sees submissions committed by concurrent requests
+    session.execute(
+        select(ChallengeStats.challenge_id).where(
+            ChallengeStats.challenge_id == submission.challenge_id
+        ).with_for_update()
+    )
+
+    # New candidate if they have no other submission to this challenge
+    earlier_submission = exists().where(
+        Submission.challenge_id == submission.challenge_id,
+        Submission.candidate_id == submission.candidate_id,
+        Submission.id != submission.id
+    )
+    statement = update(ChallengeStats).where(
+        ChallengeStats.challenge_id == submission.challenge_id
+    ).values(
+        submission_count=ChallengeStats.submission_count + 1,
+        candidate_count=ChallengeStats.candidate_count + case((earlier_submission, 0), else_=1),
+        # Greatest of the stored and new timestamps (portable form of max(a, b))
+        latest_submission_at=case(
+            (
+                (ChallengeStats.latest_submission_at.is_(None))
+                | (ChallengeStats.latest_submission_at < submission.timestamp),
+                submission.timestamp
+            ),
+            else_=ChallengeStats.latest_submission_at
+        )
+    )
+    session.execute(statement)
+
+# Function to rebuild submission aggregates for every challenge
+def rebuild_challenge_stats():
+    with Session(engine) as session:
+        challenge_ids = session.exec(select(Challenge.id)).all()
+        for challenge_id, computed in compute_challenge_stats(session, challenge_ids).items():
+            stats = session.get(ChallengeStats, challenge_id)
+            if stats is None:
+                session.add(computed)
+                continue
+            stats.submission_count = computed.submission_count
+            stats.candidate_count = computed.candidate_count
+            stats.latest_submission_at = computed.latest_submission_at
+        session.commit()
+        return len(challenge_ids)
+
+def main():
+    count = rebuild_challenge_stats()
+    print(f"Rebuilt aggregates for {count} challenges")
+
+if __name__ == "__main__":
+    main()
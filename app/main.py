@@ -1,17 +1,36 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.database import create_db_and_tables
-from app.api.routers import auth, challenges, submissions, matches, uploads
+from app.core.admission import AdmissionControlMiddleware
+from app.db.database import engine
+from app.utils.extraction import shutdown_extraction_pool
+from app.api.routers import auth, challenges, submissions, matches, uploads, metrics
+
+# Application lifespan (schema creation is done once by `python -m app.db.migrate`)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Retry failed file extractions in the background
+    extraction_sweep = asyncio.create_task(uploads.sweep_extractions())
+    yield
+    # Stop extraction workers and close pooled database connections on shutdown
+    extraction_sweep.cancel()
+    shutdown_extraction_pool()
+    engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="Skills-Based Hiring Platform API",
     description="API for a skills-based hiring platform that supports candidates and companies",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add admission control middleware (concurrency limits, load shedding, rate limits)
+app.add_middleware(AdmissionControlMiddleware)
+
+# Add CORS middleware (added last so it also wraps shed responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific origins
@@ -26,11 +45,7 @@ app.include_router(challenges.router)
 app.include_router(submissions.router)
 app.include_router(matches.router)  # Optional AI match suggestions
 app.include_router(uploads.router)  # Optional file uploads
-
-# Create database tables on startup
-@app.on_event("startup")
-def on_startup():
-    create_db_and_tables()
+app.include_router(metrics.router)
 
 # Root endpoint
 @app.get("/")
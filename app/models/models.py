@@ -23,15 +23,66 @@ class Challenge(SQLModel, table=True):
     # Relationships
     company: User = Relationship(back_populates="challenges")
     submissions: List["Submission"] = Relationship(back_populates="challenge")
+    stats: Optional["ChallengeStats"] = Relationship(back_populates="challenge")
 
-# Submission model
+# Submission model (full content lives in SubmissionContent)
 class Submission(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    content: str
+    content_preview: str = Field(default="")
+    content_length: int = Field(default=0)
+    minhash: Optional[bytes] = None  # packed MinHash signature of the content
+    cluster_id: Optional[int] = Field(default=None, index=True)  # first submission of its near-duplicate cluster
     timestamp: datetime = Field(default_factory=datetime.utcnow)
-    candidate_id: int = Field(foreign_key="user.id")
-    challenge_id: int = Field(foreign_key="challenge.id")
+    candidate_id: int = Field(foreign_key="user.id", index=True)
+    challenge_id: int = Field(foreign_key="challenge.id", index=True)
     
     # Relationships
     candidate: User = Relationship(back_populates="submissions")
-    challenge: Challenge = Relationship(back_populates="submissions") 
\ No newline at end of file
+    challenge: Challenge = Relationship(back_populates="submissions")
+    body: Optional["SubmissionContent"] = Relationship(back_populates="submission")
+    files: List["SubmissionFile"] = Relationship(back_populates="submission")
+
+# Compressed submission content, only loaded when the full text is needed
+class SubmissionContent(SQLModel, table=True):
+    submission_id: int = Field(foreign_key="submission.id", primary_key=True)
+    data: bytes  # zstd-compressed UTF-8 text
+    
+    # Relationships
+    submission: Submission = Relationship(back_populates="body")
+
+# File uploaded for a submission
+class SubmissionFile(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    submission_id: int = Field(foreign_key="submission.id", index=True)
+    filename: str
+    path: str
+    blob_hash: str = Field(index=True)  # sha256 of the file contents
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    submission: Submission = Relationship(back_populates="files")
+
+# Text extracted from an uploaded file, shared by all files with the same contents
+class ExtractedText(SQLModel, table=True):
+    blob_hash: str = Field(primary_key=True)
+    data: bytes  # zstd-compressed UTF-8 text
+    text_length: int = Field(default=0)
+    status: str = Field(default="done", index=True)  # "done", "failed" or "timeout"
+    attempts: int = Field(default=1)
+    extracted_at: datetime = Field(default_factory=datetime.utcnow)
+
+# LSH band bucket of a submission's MinHash signature
+class SubmissionLSHBand(SQLModel, table=True):
+    band: int = Field(primary_key=True)
+    bucket: int = Field(primary_key=True)
+    submission_id: int = Field(foreign_key="submission.id", primary_key=True)
+
+# Per-challenge aggregates for company dashboards, maintained as submissions are created
+class ChallengeStats(SQLModel, table=True):
+    challenge_id: int = Field(foreign_key="challenge.id", primary_key=True)
+    submission_count: int = Field(default=0)
+    candidate_count: int = Field(default=0)
+    latest_submission_at: Optional[datetime] = None
+    
+    # Relationships
+    challenge: Challenge = Relationship(back_populates="stats")
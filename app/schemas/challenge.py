@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional, List
 
 # Base challenge schema
@@ -23,4 +24,15 @@ class ChallengeWithCompany(ChallengeResponse):
     company_email: str
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Challenge dashboard aggregates
+class ChallengeStatsResponse(BaseModel):
+    challenge_id: int
+    challenge_title: str
+    submission_count: int
+    candidate_count: int
+    latest_submission_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
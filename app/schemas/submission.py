@@ -10,7 +10,7 @@ class SubmissionBase(BaseModel):
 class SubmissionCreate(SubmissionBase):
     challenge_id: int
 
-# Submission response schema
+# Submission response schema (full content)
 class SubmissionResponse(SubmissionBase):
     id: int
     timestamp: datetime
@@ -20,9 +20,22 @@ class SubmissionResponse(SubmissionBase):
     class Config:
         from_attributes = True
 
+# Submission listing schema (preview only)
+class SubmissionSummary(BaseModel):
+    id: int
+    content_preview: str
+    content_length: int
+    cluster_id: Optional[int] = None  # first submission of its near-duplicate cluster
+    timestamp: datetime
+    candidate_id: int
+    challenge_id: int
+    
+    class Config:
+        from_attributes = True
+
 # Submission with challenge info
-class SubmissionWithChallenge(SubmissionResponse):
+class SubmissionWithChallenge(SubmissionSummary):
     challenge_title: str
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
@@ -0,0 +1,21 @@
+import zstandard
+
+# Number of characters of content returned in listing endpoints
+PREVIEW_LENGTH = 200
+
+# Compression level for stored submission content
+ZSTD_LEVEL = 3
+
+# Function to build a short preview of submission content
+def make_preview(content: str, length: int = PREVIEW_LENGTH) -> str:
+    if len(content) <= length:
+        return content
+    return content[:length].rstrip() + "..."
+
+# Function to compress submission content for storage
+def compress_content(content: str) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content.encode("utf-8"))
+
+# Function to decompress stored submission content
+def decompress_content(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
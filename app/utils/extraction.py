@@ -0,0 +1,156 @@
+"""
+Text extraction for uploaded submission files.
+
+`extract_text` runs in a worker process, so this module must stay free of
+database and web imports.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional
+import multiprocessing
+import signal
+import zipfile
+
+from app.core.config import settings
+
+# Size caps
+MAX_FILE_BYTES = 10 * 1024 * 1024  # bytes read from a plain file, largest PDF parsed
+MAX_MEMBER_BYTES = 2 * 1024 * 1024  # bytes decompressed from one archive member
+MAX_ARCHIVE_BYTES = 20 * 1024 * 1024  # bytes decompressed from one archive in total
+MAX_ARCHIVE_MEMBERS = 500
+MAX_PDF_PAGES = 50
+MAX_TEXT_CHARS = 100_000  # characters of extracted text kept per file
+EXTRACTION_TIMEOUT = 60.0  # seconds of worker time for one file
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Bytes inspected to decide whether data is text
+BINARY_SNIFF_BYTES = 8192
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+class ExtractionTimeout(BaseException):
+    """
+    Raised inside a worker when a file takes longer than EXTRACTION_TIMEOUT.
+    Derives from BaseException so `except Exception` in parsers cannot swallow it.
+    """
+
+# Function to get the shared extraction process pool (created on first use)
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking a process that already runs threads can deadlock the children
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.extraction_workers,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _pool
+
+# Function to shut down the extraction process pool
+def shutdown_extraction_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+# Function to read at most `limit` bytes from a stream in chunks
+def _read_capped(stream: BinaryIO, limit: int) -> bytes:
+    chunks = []
+    remaining = limit
+    while remaining > 0:
+        chunk = stream.read(min(READ_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+# Function to decode source code or plain text, skipping binary data
+def _decode_text(data: bytes) -> str:
+    if b"\x00" in data[:BINARY_SNIFF_BYTES]:
+        return ""
+    return data.decode("utf-8", errors="replace")
+
+# Function to extract the text layer of a PDF
+def _extract_pdf(path: Path) -> str:
+    # The whole file is parsed, so oversized PDFs are skipped
+    if path.stat().st_size > MAX_FILE_BYTES:
+        return ""
+
+    from pypdf import PdfReader
+
+    parts = []
+    length = 0
+    reader = PdfReader(path)
+    for page in reader.pages[:MAX_PDF_PAGES]:
+        text = page.extract_text() or ""
+        parts.append(text)
+        length += len(text)
+        if length >= MAX_TEXT_CHARS:
+            break
+    return "\n".join(parts)
+
+# Function to extract text members of a zip archive, decompressing as a stream
+def _extract_zip(path: Path) -> str:
+    parts = []
+    total = 0
+    with zipfile.ZipFile(path) as archive:
+        for count, member in enumerate(archive.infolist()):
+            if count >= MAX_ARCHIVE_MEMBERS or total >= MAX_ARCHIVE_BYTES:
+                break
+            if member.is_dir() or Path(member.filename).suffix.lower() in (".zip", ".pdf"):
+                continue
+
+            # Sizes in the archive header are not trusted; count bytes actually read
+            try:
+                with archive.open(member) as stream:
+                    data = _read_capped(stream, min(MAX_MEMBER_BYTES, MAX_ARCHIVE_BYTES - total))
+            except (RuntimeError, zipfile.BadZipFile, NotImplementedError):
+                # Encrypted, corrupt or unsupported member
+                continue
+            total += len(data)
+
+            text = _decode_text(data)
+            if text.strip():
+                parts.append(f"# {member.filename}\n{text}")
+    return "\n\n".join(parts)
+
+def extract_text(path: str) -> str:
+    """
+    Extract searchable text from an uploaded file: source code, plain text,
+    PDF or zip archive. Returns an empty string for unsupported files.
+    """
+    file_path = Path(path)
+    suffix = file_path.suffix.lower()
+
+    try:
+        if suffix == ".pdf":
+            text = _extract_pdf(file_path)
+        elif suffix == ".zip":
+            text = _extract_zip(file_path)
+        else:
+            with open(file_path, "rb") as stream:
+                text = _decode_text(_read_capped(stream, MAX_FILE_BYTES))
+    except Exception as e:
+        print(f"Error extracting text from {file_path.name}: {str(e)}")
+        return ""
+
+    return text[:MAX_TEXT_CHARS]
+
+# Function to raise ExtractionTimeout from the worker's alarm signal
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def extract_text_with_timeout(path: str, timeout: float = EXTRACTION_TIMEOUT) -> str:
+    """
+    Run `extract_text` with a time limit enforced in the calling process, so
+    the limit counts only time spent extracting (not time queued for a worker)
+    and a slow file cannot hold its worker. Must run in the main thread.
+    """
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text(path)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from typing import Dict
+import hashlib
+import json
+from statistics import mean
+import re
+
+from app.core.config import settings
+
+# Groq API configuration
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama3-8b-8192"  # Using Llama 3 8B model which is free and fast
+
+# LRU cache to avoid repeated API calls for the same content. Results are cached
+# rather than using functools.lru_cache, which would cache a coroutine that can
+# only be awaited once.
+REPRESENTATION_CACHE_SIZE = 100
+_representation_cache: "OrderedDict[str, Dict]" = OrderedDict()
+
+async def get_embedding_representation(text: str) -> Dict:
+    """
+    Get a semantic representation of text, reusing cached results.
+    """
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if key in _representation_cache:
+        _representation_cache.move_to_end(key)
+        return _representation_cache[key]
+    
+    representation = await _extract_representation(text)
+    _representation_cache[key] = representation
+    if len(_representation_cache) > REPRESENTATION_CACHE_SIZE:
+        _representation_cache.popitem(last=False)
+    return representation
+
+async def _extract_representation(text: str) -> Dict:
+    """
+    Get a semantic representation of text using Groq's LLM.
+    This function extracts key concepts and skills from the text.
+    """
+    if not settings.groq_api_key:
+        # Fallback if no API key is provided
+        words = re.findall(r'\w+', text.lower())
+        return {word: 1 for word in set(words) if len(word) > 3}
+    
+    try:
+        headers = {
+            "Authorization": f"Bearer {settings.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        prompt = f"""
+        Extract key skills, technologies, and concepts from this text. 
+        Return a JSON object where keys are the extracted terms and values are 
+        confidence scores between 0 and 1.
+        
+        Text: {text}
+        
+        Format your response as valid JSON only, like this:
+        {{
+            "python": 0.9,
+            "data analysis": 0.7
+        }}
+        """
+        
+        payload = {
+            "model": GROQ_MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.2,
+            "max_tokens": 500
+        }
+        
+        import httpx
+        
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                GROQ_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result["choices"][0]["message"]["content"]
+                try:
+                    # Extract JSON from the response
+                    json_match = re.search(r'({.*})', content.replace('\n', ''))
+                    if json_match:
+                        return json.loads(json_match.group(1))
+                    return json.loads(content)
+                except json.JSONDecodeError:
+                    # Fallback if JSON parsing fails
+                    words = re.findall(r'\w+', content.lower())
+                    return {word: 1 for word in set(words) if len(word) > 3}
+            
+        # Fallback
+        return {"error": 1.0}
+        
+    except Exception as e:
+        print(f"Error in LLM processing: {str(e)}")
+        # Fallback to simple keyword extraction if API call fails
+        words = re.findall(r'\w+', text.lower())
+        return {word: 1 for word in set(words) if len(word) > 3}
+
+async def calculate_similarity(challenge_rep: Dict, submission_rep: Dict) -> float:
+    """
+    Calculate similarity between challenge and submission representations
+    using a combination of keyword matching and weighted scoring.
+    """
+    if not challenge_rep or not submission_rep:
+        return 0.0
+    
+    # Find common terms and calculate weighted scores
+    common_terms = set(challenge_rep.keys()) & set(submission_rep.keys())
+    if not common_terms:
+        return 0.0
+    
+    # Calculate similarities for common terms
+    similarities = []
+    for term in common_terms:
+        # Weighted by the product of both confidence scores
+        weight = challenge_rep[term] * submission_rep[term]
+        similarities.append(weight)
+    
+    # Calculate match score (average of weighted similarities)
+    match_score = mean(similarities) if similarities else 0.0
+    
+    # Scale score based on coverage (how many terms match relative to challenge terms)
+    coverage = len(common_terms) / len(challenge_rep) if challenge_rep else 0
+    final_score = match_score * (0.7 + 0.3 * coverage)
+    
+    return min(final_score, 1.0)  # Cap at 1.0
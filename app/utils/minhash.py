@@ -0,0 +1,79 @@
+from array import array
+from typing import List, Optional
+import hashlib
+import heapq
+import random
+import re
+import zlib
+
+# Signature size and LSH banding. With 8 bands of 8 rows, pairs above roughly
+# 0.77 Jaccard similarity share a band with high probability.
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 8
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Bounds on signature cost: characters of content read, and shingles hashed.
+# The shingles kept are the ones with the smallest hashes, so the same shingles
+# are sampled from every copy of a text.
+MAX_SIGNATURE_CHARS = 500_000
+MAX_SHINGLES = 2000
+
+# Estimated Jaccard similarity at which submissions are treated as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are comparable across processes and restarts
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# Function to split text into hashed word shingles (at most MAX_SHINGLES of them)
+def _shingle_hashes(text: str) -> List[int]:
+    words = re.findall(r'\w+', text[:MAX_SIGNATURE_CHARS].lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = {zlib.crc32(shingle.encode("utf-8")) for shingle in shingles}
+    if len(hashes) > MAX_SHINGLES:
+        return heapq.nsmallest(MAX_SHINGLES, hashes)
+    return list(hashes)
+
+# Function to compute the MinHash signature of a text, or None if it has no words
+def compute_signature(text: str) -> Optional[List[int]]:
+    hashes = _shingle_hashes(text)
+    if not hashes:
+        return None
+    return [
+        min((a * x + b) % _MERSENNE_PRIME for x in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+# Function to estimate Jaccard similarity from two signatures
+def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / NUM_PERMUTATIONS
+
+# Function to get the LSH bucket key of every band of a signature
+def band_keys(signature: List[int]) -> List[int]:
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = array("I", signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))  # fits a signed 64-bit column
+    return keys
+
+# Function to pack a signature for storage
+def pack_signature(signature: List[int]) -> bytes:
+    return array("I", signature).tobytes()
+
+# Function to unpack a stored signature
+def unpack_signature(data: bytes) -> List[int]:
+    return array("I", data).tolist()
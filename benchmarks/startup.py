@@ -0,0 +1,57 @@
+"""
+Cold-start benchmark: time to import `app.main` in a fresh interpreter and the
+resident memory of that process, which is the baseline RSS of each worker.
+
+    python benchmarks/startup.py [--runs 10]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so nothing is already imported
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "httpx_loaded": "httpx" in sys.modules,
+    "matcher_loaded": "app.utils.matcher" in sys.modules,
+}))
+"""
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    import_times = [r["import_seconds"] * 1000 for r in results]
+    rss = [r["rss_mb"] for r in results]
+
+    print(f"runs:              {args.runs}")
+    print(f"cold import (ms):  median {statistics.median(import_times):.1f}, min {min(import_times):.1f}, max {max(import_times):.1f}")
+    print(f"worker RSS (MB):   median {statistics.median(rss):.1f}")
+    print(f"httpx loaded:      {results[0]['httpx_loaded']}")
+    print(f"matcher loaded:    {results[0]['matcher_loaded']}")
+
+if __name__ == "__main__":
+    main()
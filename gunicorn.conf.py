@@ -0,0 +1,26 @@
+# Multi-worker launch profile:
+#
+#     gunicorn app.main:app -c gunicorn.conf.py
+#
+# The schema migration runs once in the master process before workers fork.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Load the app in the master so workers share its memory pages (copy-on-write)
+preload_app = True
+
+def on_starting(server):
+    from app.db.migrate import main as migrate
+    migrate()
+
+def post_fork(server, worker):
+    # Connections inherited from the master must not be reused by workers
+    from app.db.database import engine
+    engine.dispose(close=False)
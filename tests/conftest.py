@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.db.database import enable_sqlite_wal, get_session
+from app.main import app
+from app.models.models import User, Challenge
+from app.utils.auth import get_current_user
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", enable_sqlite_wal)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    with Session(engine) as session:
+        session.add_all([
+            User(id=1, email="co@example.com", hashed_password="x", role="company"),
+            User(id=2, email="alice@example.com", hashed_password="x", role="candidate"),
+            User(id=3, email="bob@example.com", hashed_password="x", role="candidate"),
+        ])
+        session.add(Challenge(id=1, title="API design", description="Build an API", company_id=1))
+        session.commit()
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    client = TestClient(app)
+    client.user_id = 2
+
+    def override_user():
+        with Session(engine) as session:
+            return session.get(User, client.user_id)
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_user] = override_user
+    yield client
+    app.dependency_overrides.clear()
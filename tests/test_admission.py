@@ -0,0 +1,127 @@
+import asyncio
+
+from app.core import admission
+from app.core.admission import RouteClassConfig, RouteClassLimiter, classify_request
+
+
+def make_limiter(**overrides):
+    config = dict(max_concurrent=1, max_queue=1, queue_timeout=0.05, rate_per_minute=60, burst=2, retry_after=7)
+    config.update(overrides)
+    return RouteClassLimiter(name="test", config=RouteClassConfig(**config))
+
+
+def test_classify_request():
+    assert classify_request("POST", "/auth/login") == "auth"
+    assert classify_request("POST", "/upload/submission/1/file") == "uploads"
+    assert classify_request("GET", "/match/suggestions") == "matching"
+    assert classify_request("GET", "/submissions/export") == "exports"
+    assert classify_request("POST", "/submissions/") == "writes"
+    assert classify_request("GET", "/challenges/") == "reads"
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    limiter = make_limiter()
+
+    # Burst of 2, then limited until a token refills at 1 per second
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") == 1
+    assert limiter.rate_limited == 1
+
+    now[0] += 1.0
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") is not None
+
+    # Refill is capped at the burst size
+    now[0] += 60.0
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") is not None
+
+
+def test_token_buckets_are_per_user(monkeypatch):
+    monkeypatch.setattr(admission.time, "monotonic", lambda: 1000.0)
+    limiter = make_limiter(burst=1)
+
+    assert limiter.check_rate("user:a") is None
+    assert limiter.check_rate("user:a") is not None
+    assert limiter.check_rate("user:b") is None
+
+
+def test_refund_restores_token(monkeypatch):
+    monkeypatch.setattr(admission.time, "monotonic", lambda: 1000.0)
+    limiter = make_limiter(burst=1)
+
+    assert limiter.check_rate("user:a") is None
+    limiter.refund_rate("user:a")
+    assert limiter.check_rate("user:a") is None
+
+
+def test_queue_full_is_shed_immediately():
+    async def scenario():
+        limiter = make_limiter(max_concurrent=1, max_queue=1, queue_timeout=1.0)
+        assert await limiter.acquire()
+
+        # One request may wait; the next one is shed without waiting
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queue_depth"] == 1
+        assert await limiter.acquire() is False
+        assert limiter.shed == 1
+
+        limiter.release()
+        assert await waiter
+        assert limiter.snapshot()["active"] == 1
+        limiter.release()
+        assert limiter.snapshot()["active"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        limiter = make_limiter(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+        assert await limiter.acquire()
+        assert await limiter.acquire() is False
+        assert limiter.shed == 1
+        assert limiter.snapshot()["queue_depth"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_shed_request_refunds_rate_token(monkeypatch):
+    controller = admission.AdmissionController({"reads": RouteClassConfig(
+        max_concurrent=1, max_queue=0, queue_timeout=0.01, rate_per_minute=60, burst=2, retry_after=7
+    )})
+    monkeypatch.setattr(admission, "classify_request", lambda method, path: "reads")
+
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def scenario():
+        middleware = admission.AdmissionControlMiddleware(slow_app, controller)
+        statuses = []
+
+        async def request():
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            scope = {"type": "http", "method": "GET", "path": "/", "headers": [], "client": ("1.2.3.4", 1)}
+            await middleware(scope, receive, send)
+
+        # Second request is shed while the first holds the only slot
+        await asyncio.gather(request(), request())
+        assert sorted(statuses) == [200, 503]
+
+        # The shed request's token was refunded, so one token remains
+        assert controller.limiters["reads"].check_rate("ip:1.2.3.4") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,23 @@
+from app.utils.content import PREVIEW_LENGTH, compress_content, decompress_content, make_preview
+
+
+def test_make_preview_keeps_short_content():
+    assert make_preview("print('hello')") == "print('hello')"
+    assert make_preview("a" * PREVIEW_LENGTH) == "a" * PREVIEW_LENGTH
+
+
+def test_make_preview_truncates_long_content():
+    content = "word " * 100
+    preview = make_preview(content)
+
+    assert preview.endswith("...")
+    assert len(preview) <= PREVIEW_LENGTH + 3
+    assert content.startswith(preview[:-3])
+
+
+def test_compress_round_trips_unicode():
+    content = "def greet():\n    return 'héllo wörld ✓'\n" * 50
+    data = compress_content(content)
+
+    assert len(data) < len(content.encode("utf-8"))
+    assert decompress_content(data) == content
@@ -0,0 +1,74 @@
+import random
+
+from sqlmodel import Session, select, func
+
+from app.db import migrate
+from app.db.duplicates import assign_duplicate_cluster
+from app.models.models import Submission, SubmissionContent, SubmissionLSHBand
+from app.utils.content import compress_content
+from app.utils.minhash import NUM_BANDS
+
+
+def random_text(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randint(0, 5000)}" for _ in range(words))
+
+
+def add_submission(session, content, cluster=True):
+    submission = Submission(content_preview="", content_length=len(content), candidate_id=1, challenge_id=1)
+    submission.body = SubmissionContent(data=compress_content(content))
+    session.add(submission)
+    session.flush()
+    if cluster:
+        assign_duplicate_cluster(session, submission, content)
+    session.commit()
+    return submission
+
+
+def band_count(session):
+    return session.exec(select(func.count()).select_from(SubmissionLSHBand)).one()
+
+
+def test_only_cluster_representatives_are_indexed(engine):
+    text = random_text(1)
+    with Session(engine) as session:
+        copies = [add_submission(session, text) for _ in range(5)]
+        other = add_submission(session, random_text(2))
+
+        assert {copy.cluster_id for copy in copies} == {copies[0].id}
+        assert other.cluster_id == other.id
+        assert band_count(session) == 2 * NUM_BANDS
+
+
+def test_migration_clusters_existing_submissions(engine, monkeypatch):
+    monkeypatch.setattr(migrate, "engine", engine)
+    monkeypatch.setattr(migrate, "CLUSTER_BATCH_SIZE", 2)
+    text = random_text(1)
+    with Session(engine) as session:
+        legacy_ids = [add_submission(session, content, cluster=False).id for content in (text, random_text(2), text)]
+
+    migrate.backfill_duplicate_clusters()
+
+    with Session(engine) as session:
+        clusters = [session.get(Submission, submission_id).cluster_id for submission_id in legacy_ids]
+        assert clusters == [legacy_ids[0], legacy_ids[1], legacy_ids[0]]
+        assert band_count(session) == 2 * NUM_BANDS
+
+        # New copies join the clusters of existing content
+        assert add_submission(session, text).cluster_id == legacy_ids[0]
+
+
+def test_migration_prunes_index_entries_of_duplicates(engine, monkeypatch):
+    monkeypatch.setattr(migrate, "engine", engine)
+    with Session(engine) as session:
+        first_id = add_submission(session, random_text(1)).id
+        second_id = add_submission(session, random_text(1)).id
+        # Indexed as it was before only representatives were indexed
+        session.add(SubmissionLSHBand(band=0, bucket=1, submission_id=second_id))
+        session.commit()
+
+    migrate.backfill_duplicate_clusters()
+
+    with Session(engine) as session:
+        indexed = set(session.exec(select(SubmissionLSHBand.submission_id)).all())
+        assert indexed == {first_id}
@@ -0,0 +1,104 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+from sqlmodel import Session
+
+from app.api.routers import submissions
+from app.api.routers.submissions import (
+    EXPORT_FIELDS,
+    encode_csv,
+    encode_ndjson,
+    gzip_stream,
+    to_naive_utc,
+)
+from app.models.models import Challenge, Submission, SubmissionContent, User
+from app.utils.content import compress_content
+
+
+def make_row(submission_id, content="print('hello')"):
+    return {
+        "id": submission_id,
+        "challenge_id": 1,
+        "challenge_title": "API design",
+        "candidate_id": 2,
+        "candidate_email": "candidate@example.com",
+        "timestamp": "2024-01-01T00:00:00",
+        "content": content,
+    }
+
+
+def test_encode_ndjson_one_line_per_row():
+    batches = [[make_row(1)], [make_row(2), make_row(3, "multi\nline")]]
+    chunks = list(encode_ndjson(iter(batches)))
+
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    assert json.loads(lines[2])["content"] == "multi\nline"
+
+
+def test_encode_csv_sends_header_before_first_batch():
+    def batches():
+        yield [make_row(1, 'quoted "value", with comma')]
+        raise AssertionError("only the first batch should be consumed")
+
+    chunks = encode_csv(batches())
+    assert next(chunks).decode("utf-8").strip() == ",".join(EXPORT_FIELDS)
+
+    rows = list(csv.DictReader(io.StringIO(",".join(EXPORT_FIELDS) + "\n" + next(chunks).decode("utf-8"))))
+    assert rows[0]["content"] == 'quoted "value", with comma'
+
+
+def test_encode_csv_writes_each_row_once():
+    batches = [[make_row(1)], [make_row(2), make_row(3)]]
+    rows = list(csv.DictReader(io.StringIO(b"".join(encode_csv(iter(batches))).decode("utf-8"))))
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+
+
+def test_gzip_stream_round_trips_and_flushes_each_chunk():
+    chunks = [b"first line\n", b"second line\n"]
+    compressed = list(gzip_stream(iter(chunks)))
+
+    # Each input chunk produces output that is decodable on its own
+    decompressor = zlib.decompressobj(wbits=31)
+    assert decompressor.decompress(compressed[0]) == chunks[0]
+
+    assert gzip.decompress(b"".join(compressed)) == b"".join(chunks)
+
+
+def test_to_naive_utc():
+    assert to_naive_utc(None) is None
+    naive = datetime(2024, 1, 1, 12, 0)
+    assert to_naive_utc(naive) == naive
+    offset = datetime(2024, 1, 1, 17, 0, tzinfo=timezone(timedelta(hours=5)))
+    assert to_naive_utc(offset) == datetime(2024, 1, 1, 12, 0)
+
+
+def test_export_stream_does_not_block_writes(engine, monkeypatch):
+    monkeypatch.setattr(submissions, "engine", engine)
+    monkeypatch.setattr(submissions, "EXPORT_BATCH_SIZE", 1)
+    with Session(engine) as session:
+        session.add(User(id=1, email="co@example.com", hashed_password="x", role="company"))
+        session.add(User(id=2, email="ca@example.com", hashed_password="x", role="candidate"))
+        session.add(Challenge(id=1, title="API design", description="Build an API", company_id=1))
+        for _ in range(3):
+            submission = Submission(content_preview="", content_length=0, candidate_id=2, challenge_id=1)
+            submission.body = SubmissionContent(data=compress_content("print(1)"))
+            session.add(submission)
+        session.commit()
+
+    # Leave the export half-read, holding its read transaction open
+    batches = submissions.iter_export_rows(1, None, None, None)
+    assert next(batches)[0]["id"] == 1
+
+    writer = create_engine(engine.url, connect_args={"timeout": 0.5})
+    with writer.begin() as connection:
+        connection.execute(text("UPDATE user SET role = 'company' WHERE id = 2"))
+    writer.dispose()
+
+    assert [rows[0]["id"] for rows in batches] == [2, 3]
@@ -0,0 +1,160 @@
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.api.routers import uploads
+from app.models.models import ExtractedText, SubmissionFile
+from app.utils import extraction
+from app.utils.extraction import ExtractionTimeout, extract_text, extract_text_with_timeout
+
+
+def write_zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return path
+
+
+def test_zip_extracts_text_members(tmp_path):
+    path = write_zip(tmp_path / "code.zip", [
+        ("src/app.py", "import fastapi\n"),
+        ("docs/", ""),
+        ("image.png", b"\x89PNG\x00\x00binary"),
+        ("nested.zip", b"PK\x03\x04"),
+    ])
+
+    text = extract_text(str(path))
+
+    assert "# src/app.py\nimport fastapi" in text
+    assert "image.png" not in text
+    assert "nested.zip" not in text
+
+
+def test_zip_member_cap_limits_bytes_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_MEMBER_BYTES", 100)
+    path = write_zip(tmp_path / "big.zip", [("big.txt", "a" * 10_000)])
+
+    text = extract_text(str(path))
+
+    assert text.count("a") == 100
+
+
+def test_zip_archive_cap_limits_total_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_MEMBER_BYTES", 1000)
+    monkeypatch.setattr(extraction, "MAX_ARCHIVE_BYTES", 150)
+    path = write_zip(tmp_path / "many.zip", [
+        ("first.txt", "1" * 100),
+        ("second.txt", "2" * 100),
+        ("third.txt", "3" * 100),
+    ])
+
+    text = extract_text(str(path))
+
+    assert text.count("1") == 100
+    assert text.count("2") == 50
+    assert "third.txt" not in text
+
+
+def test_zip_member_count_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_ARCHIVE_MEMBERS", 2)
+    path = write_zip(tmp_path / "members.zip", [(f"f{i}.txt", f"member{i}") for i in range(5)])
+
+    text = extract_text(str(path))
+
+    assert "member0" in text and "member1" in text
+    assert "member2" not in text
+
+
+def test_zip_bomb_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_MEMBER_BYTES", 1024)
+    path = write_zip(tmp_path / "bomb.zip", [("bomb.txt", b"0" * (20 * 1024 * 1024))])
+
+    text = extract_text(str(path))
+
+    assert len(text) <= 1024 + len("# bomb.txt\n")
+
+
+def test_corrupt_zip_returns_empty(tmp_path):
+    path = tmp_path / "broken.zip"
+    path.write_bytes(b"not a zip file")
+
+    assert extract_text(str(path)) == ""
+
+
+def test_oversized_pdf_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_FILE_BYTES", 10)
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4" + b"0" * 100)
+
+    assert extract_text(str(path)) == ""
+
+
+def test_plain_text_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, "MAX_TEXT_CHARS", 5)
+    path = tmp_path / "notes.py"
+    path.write_text("def fastapi(): pass")
+
+    assert extract_text(str(path)) == "def f"
+
+
+def test_extraction_timeout_interrupts_work(monkeypatch):
+    def slow_extract(path):
+        try:
+            while True:
+                pass
+        except Exception:
+            # Parsers that swallow errors must not swallow the timeout
+            return "swallowed"
+
+    monkeypatch.setattr(extraction, "extract_text", slow_extract)
+
+    started = time.monotonic()
+    with pytest.raises(ExtractionTimeout):
+        extract_text_with_timeout("slow.pdf", timeout=0.1)
+    assert time.monotonic() - started < 5
+
+
+def test_extraction_timeout_is_cleared_after_success(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+
+    assert extract_text_with_timeout(str(path), timeout=0.2) == "hello"
+    time.sleep(0.3)  # an alarm left armed would raise here
+
+
+def test_failed_extraction_is_retried(engine, monkeypatch):
+    monkeypatch.setattr(uploads, "engine", engine)
+    monkeypatch.setattr(uploads, "MAX_EXTRACTION_ATTEMPTS", 2)
+    with Session(engine) as session:
+        session.add(SubmissionFile(submission_id=1, filename="a.pdf", path="/files/a.pdf", blob_hash="slow"))
+        session.add(SubmissionFile(
+            submission_id=1, filename="b.txt", path="/files/b.txt", blob_hash="lost",
+            uploaded_at=datetime.utcnow() - timedelta(hours=1)
+        ))
+        session.add(SubmissionFile(submission_id=1, filename="c.txt", path="/files/c.txt", blob_hash="queued"))
+        session.commit()
+
+    uploads.store_extracted_text("slow", "", "timeout")
+    assert uploads.find_extraction_retries() == {"slow": "/files/a.pdf", "lost": "/files/b.txt"}
+
+    # Out of attempts after a second failure
+    uploads.store_extracted_text("slow", "", "timeout")
+    assert "slow" not in uploads.find_extraction_retries()
+
+    with Session(engine) as session:
+        assert session.get(ExtractedText, "slow").attempts == 2
+
+
+def test_successful_extraction_is_kept(engine, monkeypatch):
+    monkeypatch.setattr(uploads, "engine", engine)
+
+    uploads.store_extracted_text("blob", "", "failed")
+    uploads.store_extracted_text("blob", "text", "done")
+    uploads.store_extracted_text("blob", "", "failed")
+
+    with Session(engine) as session:
+        extracted = session.get(ExtractedText, "blob")
+        assert (extracted.status, extracted.text_length) == ("done", 4)
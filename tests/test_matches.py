@@ -0,0 +1,59 @@
+from sqlmodel import Session
+
+from app.models.models import User, Challenge, SubmissionFile, ExtractedText
+from app.utils import matcher
+from app.utils.content import compress_content
+
+CONTENT = "Built a python fastapi service with sqlmodel models, token auth and tests for every endpoint. " * 5
+
+
+async def keyword_representation(text):
+    return {word: 1 for word in set(text.lower().split()) if len(word) > 3}
+
+
+def test_duplicates_with_different_files_are_scored_separately(client, engine, monkeypatch):
+    monkeypatch.setattr(matcher, "_extract_representation", keyword_representation)
+    monkeypatch.setattr(matcher, "_representation_cache", matcher.OrderedDict())
+    with Session(engine) as session:
+        session.add(User(id=4, email="hiring@example.com", hashed_password="x", role="company"))
+        session.add(Challenge(id=2, title="python fastapi", description="python fastapi service with kubernetes", company_id=4))
+        session.commit()
+
+    ids = []
+    for user_id in (2, 3, 2):
+        client.user_id = user_id
+        ids.append(client.post("/submissions/", json={"challenge_id": 1, "content": CONTENT}).json()["id"])
+
+    # The third copy also uploaded a file with more skills
+    with Session(engine) as session:
+        session.add(SubmissionFile(submission_id=ids[2], filename="deploy.md", path="/files/deploy.md", blob_hash="deploy"))
+        session.add(ExtractedText(blob_hash="deploy", data=compress_content("kubernetes deployment"), text_length=21))
+        session.commit()
+
+    client.user_id = 4
+    suggestions = {s["submission_id"]: s for s in client.get("/match/suggestions").json()}
+
+    assert set(suggestions) == {ids[0], ids[2]}
+    assert suggestions[ids[0]]["duplicate_submission_ids"] == [ids[1]]
+    assert suggestions[ids[2]]["duplicate_submission_ids"] == []
+
+
+def test_score_distribution_is_a_snapshot(client, engine, monkeypatch):
+    monkeypatch.setattr(matcher, "_extract_representation", keyword_representation)
+    monkeypatch.setattr(matcher, "_representation_cache", matcher.OrderedDict())
+    with Session(engine) as session:
+        session.add(User(id=4, email="hiring@example.com", hashed_password="x", role="company"))
+        session.add(Challenge(id=2, title="python fastapi", description="python fastapi service", company_id=4))
+        session.commit()
+
+    for content in (CONTENT, CONTENT, "A small rust command line tool for parsing logs quickly"):
+        client.post("/submissions/", json={"challenge_id": 1, "content": content})
+
+    client.user_id = 4
+    distribution = client.get("/match/score-distribution").json()
+
+    assert [row["challenge_id"] for row in distribution] == [2]
+    # Two near-duplicate groups: the repeated content, and the rust tool
+    assert distribution[0]["scored_groups"] == 2
+    assert sum(distribution[0]["score_histogram"]) == 2
+    assert distribution[0]["score_histogram"][0] == 1
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import Session
+
+from app.db import database, migrate
+from app.models.models import ChallengeStats, Submission, SubmissionContent
+from app.utils.content import PREVIEW_LENGTH, decompress_content
+
+# Tables as created by the first release, before content moved to submissioncontent
+LEGACY_SCHEMA = [
+    'CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL, role VARCHAR NOT NULL)',
+    'CREATE TABLE challenge (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR NOT NULL, company_id INTEGER NOT NULL REFERENCES user (id))',
+    'CREATE TABLE submission (id INTEGER PRIMARY KEY, content VARCHAR NOT NULL, timestamp DATETIME NOT NULL, candidate_id INTEGER NOT NULL REFERENCES user (id), challenge_id INTEGER NOT NULL REFERENCES challenge (id))',
+]
+
+
+def make_legacy_database(tmp_path, monkeypatch, contents):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for ddl in LEGACY_SCHEMA:
+            connection.execute(text(ddl))
+        connection.execute(text("INSERT INTO user VALUES (1, 'co@example.com', 'x', 'company'), (2, 'ca@example.com', 'x', 'candidate')"))
+        connection.execute(text("INSERT INTO challenge VALUES (1, 'API design', 'Build an API', 1)"))
+        for submission_id, content in enumerate(contents, start=1):
+            connection.execute(
+                text("INSERT INTO submission VALUES (:id, :content, '2024-01-01 00:00:00', 2, 1)"),
+                {"id": submission_id, "content": content}
+            )
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(migrate, "engine", engine)
+    return engine
+
+
+def test_migrate_moves_legacy_content(tmp_path, monkeypatch):
+    contents = ["print('hello')", "x" * (PREVIEW_LENGTH + 50), ""]
+    engine = make_legacy_database(tmp_path, monkeypatch, contents)
+    monkeypatch.setattr(migrate, "CONTENT_BATCH_SIZE", 2)
+
+    migrate.main()
+
+    assert "content" not in {column["name"] for column in inspect(engine).get_columns("submission")}
+    with Session(engine) as session:
+        for submission_id, content in enumerate(contents, start=1):
+            submission = session.get(Submission, submission_id)
+            assert submission.content_length == len(content)
+            assert submission.content_preview == (content if len(content) <= PREVIEW_LENGTH else "x" * PREVIEW_LENGTH + "...")
+            assert decompress_content(session.get(SubmissionContent, submission_id).data) == content
+
+
+def test_migrate_twice_is_a_no_op(tmp_path, monkeypatch):
+    engine = make_legacy_database(tmp_path, monkeypatch, ["print('hello')"])
+
+    migrate.main()
+    migrate.main()
+
+    with Session(engine) as session:
+        assert decompress_content(session.get(SubmissionContent, 1).data) == "print('hello')"
+        assert session.get(Submission, 1).content_length == len("print('hello')")
+
+
+def test_migrated_database_accepts_new_submissions(tmp_path, monkeypatch):
+    engine = make_legacy_database(tmp_path, monkeypatch, ["print('hello')"])
+
+    migrate.main()
+
+    with Session(engine) as session:
+        submission = Submission(content_preview="new", content_length=3, candidate_id=2, challenge_id=1)
+        submission.body = SubmissionContent(data=b"")
+        session.add(submission)
+        session.commit()
+        assert submission.id == 2
+
+
+def test_migrate_builds_aggregates_for_existing_challenges(tmp_path, monkeypatch):
+    engine = make_legacy_database(tmp_path, monkeypatch, ["print('hello')", "print('again')"])
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO challenge VALUES (2, 'Empty', 'No submissions yet', 1)"))
+
+    migrate.main()
+
+    with Session(engine) as session:
+        stats = session.get(ChallengeStats, 1)
+        assert (stats.submission_count, stats.candidate_count) == (2, 1)
+        assert stats.latest_submission_at == datetime(2024, 1, 1)
+        assert session.get(ChallengeStats, 2).submission_count == 0
@@ -0,0 +1,73 @@
+import random
+
+from app.utils import minhash
+from app.utils.minhash import (
+    NUM_BANDS,
+    NUM_PERMUTATIONS,
+    band_keys,
+    compute_signature,
+    estimate_similarity,
+    pack_signature,
+    unpack_signature,
+)
+
+
+def random_text(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randint(0, 5000)}" for _ in range(words))
+
+
+def test_signature_is_deterministic():
+    text = random_text(1)
+    signature = compute_signature(text)
+
+    assert len(signature) == NUM_PERMUTATIONS
+    assert signature == compute_signature(text)
+    assert compute_signature(text.upper()) == signature
+
+
+def test_signature_of_text_without_words_is_none():
+    assert compute_signature("") is None
+    assert compute_signature("  ... !!! ---") is None
+    assert compute_signature("one") is not None
+
+
+def test_estimate_similarity():
+    text = random_text(1)
+    words = text.split()
+    near_duplicate = " ".join(words[:200] + ["changed"] + words[201:])
+
+    assert estimate_similarity(compute_signature(text), compute_signature(text)) == 1.0
+    assert estimate_similarity(compute_signature(text), compute_signature(near_duplicate)) >= 0.8
+    assert estimate_similarity(compute_signature(text), compute_signature(random_text(2))) < 0.2
+
+
+def test_band_keys():
+    text = random_text(1)
+    words = text.split()
+    near_duplicate = " ".join(words[:200] + ["changed"] + words[201:])
+
+    keys = band_keys(compute_signature(text))
+    assert len(keys) == NUM_BANDS
+    assert all(-(1 << 63) <= key < (1 << 63) for key in keys)
+    assert keys == band_keys(compute_signature(text))
+
+    # Near-duplicates share at least one bucket, unrelated texts none
+    assert set(keys) & set(band_keys(compute_signature(near_duplicate)))
+    assert not set(keys) & set(band_keys(compute_signature(random_text(2))))
+
+
+def test_shingles_are_capped(monkeypatch):
+    monkeypatch.setattr(minhash, "MAX_SHINGLES", 50)
+    text = random_text(1, words=5000)
+
+    hashes = minhash._shingle_hashes(text)
+    assert len(hashes) == 50
+
+    # The sample is the same for every copy of the text
+    assert compute_signature(text) == compute_signature(text + " ")
+
+
+def test_pack_round_trip():
+    signature = compute_signature(random_text(1))
+    assert unpack_signature(pack_signature(signature)) == signature
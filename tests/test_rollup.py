@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.db import rollup
+from app.db.rollup import ensure_challenge_stats, rebuild_challenge_stats, record_submission
+from app.models.models import User, Challenge, ChallengeStats, Submission
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        session.add_all([User(id=candidate_id, email=f"user{candidate_id}@example.com", hashed_password="x") for candidate_id in (1, 2, 3)])
+        session.add(Challenge(id=1, title="API design", description="Build an API", company_id=1))
+        session.commit()
+        yield session
+
+
+def submit(session, candidate_id, timestamp, record=True):
+    submission = Submission(candidate_id=candidate_id, challenge_id=1, timestamp=timestamp)
+    session.add(submission)
+    session.flush()
+    if record:
+        record_submission(session, submission)
+    session.commit()
+    return submission
+
+
+def get_stats(session):
+    stats = session.get(ChallengeStats, 1)
+    session.refresh(stats)
+    return stats
+
+
+def test_repeat_submissions_count_the_candidate_once(session):
+    submit(session, 2, datetime(2024, 1, 1))
+    submit(session, 2, datetime(2024, 1, 2))
+    submit(session, 3, datetime(2024, 1, 3))
+
+    stats = get_stats(session)
+    assert (stats.submission_count, stats.candidate_count) == (3, 2)
+
+
+def test_latest_submission_time_only_moves_forward(session):
+    submit(session, 2, datetime(2024, 1, 5))
+    submit(session, 3, datetime(2024, 1, 3))
+
+    assert get_stats(session).latest_submission_at == datetime(2024, 1, 5)
+
+    submit(session, 3, datetime(2024, 1, 7))
+    assert get_stats(session).latest_submission_at == datetime(2024, 1, 7)
+
+
+def test_challenge_without_stats_row_is_seeded_from_earlier_submissions(session):
+    # Submissions from before the aggregates existed
+    submit(session, 2, datetime(2024, 1, 1), record=False)
+    submit(session, 3, datetime(2024, 1, 2), record=False)
+    assert session.get(ChallengeStats, 1) is None
+
+    submit(session, 2, datetime(2024, 1, 3))
+
+    stats = get_stats(session)
+    assert (stats.submission_count, stats.candidate_count) == (3, 2)
+    assert stats.latest_submission_at == datetime(2024, 1, 3)
+
+
+def test_ensure_challenge_stats_excludes_the_new_submission(session):
+    submission = submit(session, 2, datetime(2024, 1, 1), record=False)
+
+    ensure_challenge_stats(session, 1, exclude_submission_id=submission.id)
+
+    stats = get_stats(session)
+    assert (stats.submission_count, stats.candidate_count, stats.latest_submission_at) == (0, 0, None)
+
+    # An existing row is left alone
+    ensure_challenge_stats(session, 1)
+    assert get_stats(session).submission_count == 0
+
+
+def test_rebuild_repairs_drift(session, engine, monkeypatch):
+    monkeypatch.setattr(rollup, "engine", engine)
+    submit(session, 2, datetime(2024, 1, 1))
+    submit(session, 3, datetime(2024, 1, 2), record=False)
+
+    assert rebuild_challenge_stats() == 1
+
+    stats = get_stats(session)
+    assert (stats.submission_count, stats.candidate_count) == (2, 2)
+    assert stats.latest_submission_at == datetime(2024, 1, 2)
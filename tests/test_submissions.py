@@ -0,0 +1,40 @@
+from app.utils.content import PREVIEW_LENGTH
+
+
+def test_create_submission_stores_preview_and_length(client):
+    content = "def solve():\n    return 42\n" * 20
+    response = client.post("/submissions/", json={"challenge_id": 1, "content": content})
+    assert response.status_code == 201
+    assert response.json()["content"] == content
+
+    listed = client.get("/submissions/my").json()
+    assert listed[0]["content_length"] == len(content)
+    assert len(listed[0]["content_preview"]) <= PREVIEW_LENGTH + 3
+    assert "content" not in listed[0]
+
+    detail = client.get(f"/submissions/{listed[0]['id']}").json()
+    assert detail["content"] == content
+
+
+def test_candidates_cannot_read_other_candidates_submissions(client):
+    submission_id = client.post("/submissions/", json={"challenge_id": 1, "content": "print(1)"}).json()["id"]
+
+    client.user_id = 3
+    assert client.get(f"/submissions/{submission_id}").status_code == 404
+
+    client.user_id = 1
+    assert client.get(f"/submissions/{submission_id}").json()["content"] == "print(1)"
+
+
+def test_dashboard_reports_challenge_aggregates(client):
+    for user_id in (2, 2, 3):
+        client.user_id = user_id
+        client.post("/submissions/", json={"challenge_id": 1, "content": "print(1)"})
+
+    client.user_id = 1
+    dashboard = client.get("/challenges/dashboard").json()
+
+    assert len(dashboard) == 1
+    assert dashboard[0]["challenge_title"] == "API design"
+    assert (dashboard[0]["submission_count"], dashboard[0]["candidate_count"]) == (3, 2)
+    assert dashboard[0]["latest_submission_at"] is not None